@@ -23,15 +23,19 @@ Implementation Notes
     https://circuitpython.org/downloads
  * Adafruit's Bus Device library: https://github.com/adafruit/Adafruit_CircuitPython_BusDevice
  * Adafruit's Register library: https://github.com/adafruit/Adafruit_CircuitPython_Register
+ * Adafruit's Ticks library: https://github.com/adafruit/Adafruit_CircuitPython_Ticks
 
 """
 __version__ = "0.0.0+auto.0"
 __repo__ = "https://github.com/adafruit/Adafruit_CircuitPython_HTS221.git"
 
+import struct
+import time
 from micropython import const
+from adafruit_ticks import ticks_ms, ticks_diff
 import adafruit_bus_device.i2c_device as i2cdevice
 from adafruit_register.i2c_struct import ROUnaryStruct
-from adafruit_register.i2c_bits import RWBits, ROBits
+from adafruit_register.i2c_bits import RWBits
 from adafruit_register.i2c_bit import RWBit, ROBit
 
 try:
@@ -43,25 +47,14 @@ except ImportError:
 _WHO_AM_I = const(0x0F)
 
 _CTRL_REG1 = const(0x20)
+_CTRL_REG1_PD = const(0x80)  # Power down control, set to enable the sensor
+_CTRL_REG1_ODR_MASK = const(0x03)  # Output data rate field
 _CTRL_REG2 = const(0x21)
 _CTRL_REG3 = const(0x22)
 _STATUS_REG = const(0x27)
-# some addresses are anded to set the  top bit so that multi-byte reads will work
-_HUMIDITY_OUT_L = const(0x28 | 0x80)  # Humidity output register (LSByte)
-_TEMP_OUT_L = const(0x2A | 0x80)  # Temperature output register (LSByte)
+_HUMIDITY_OUT_L = const(0x28)  # Humidity output register (LSByte)
 
-_H0_RH_X2 = const(0x30)  # Humididy calibration LSB values
-_H1_RH_X2 = const(0x31)  # Humididy calibration LSB values
-
-_T0_DEGC_X8 = const(0x32)  # First byte of T0, T1 calibration values
-_T1_DEGC_X8 = const(0x33)  # First byte of T0, T1 calibration values
-_T1_T0_MSB = const(0x35)  # Top 2 bits of T0 and T1 (each are 10 bits)
-
-_H0_T0_OUT = const(0x36 | 0x80)  # Humididy calibration Time 0 value
-_H1_T1_OUT = const(0x3A | 0x80)  # Humididy calibration Time 1 value
-
-_T0_OUT = const(0x3C | 0x80)  # T0_OUT LSByte
-_T1_OUT = const(0x3E | 0x80)  # T1_OUT LSByte
+_H0_RH_X2 = const(0x30)  # Start of the calibration block, see _load_calibration_values
 
 _HTS221_CHIP_ID = 0xBC
 _HTS221_DEFAULT_ADDRESS = 0x5F
@@ -82,10 +75,13 @@ class CV:
             setattr(cls, name, value)
             cls.label[value] = label
 
+        cls._valid = frozenset(value for _, value, _ in value_tuples)
+
     @classmethod
     def is_valid(cls, value: int) -> bool:
         """Returns true if the given value is a member of the CV"""
-        return value in cls.label
+        # pylint: disable-next=unidiomatic-typecheck
+        return type(value) is int and value in cls._valid
 
 
 class Rate(CV):
@@ -123,6 +119,19 @@ class HTS221:  # pylint: disable=too-many-instance-attributes
     """Library for the ST HTS221 Humidity and Temperature Sensor
 
     :param ~busio.I2C i2c_bus: The I2C bus the HTS221 is connected to
+    :param float max_age: The number of seconds a measurement read from the sensor is reused
+        for before it is read again, so that reading :attr:`relative_humidity` and
+        :attr:`temperature` back to back takes a single I2C transaction. Defaults to ``0.05``.
+        Set to ``0`` to read the sensor on every access. When :attr:`humidity_data_ready` or
+        :attr:`temperature_data_ready` returns `True` the cached reading is discarded, so the
+        next read returns the new measurement. The age is tracked with ``adafruit_ticks``, whose
+        millisecond counter wraps every 2**29 ms (about 6.2 days): a reading is only reused when
+        less than ``max_age`` has elapsed modulo that period, so after an idle gap of a near exact
+        multiple of it the old reading may be returned once more
+    :param bool reset: If `True` (the default), reboot the sensor and enable it at 12.5 Hz.
+        With `False` the current CTRL_REG1 configuration is left untouched, which is useful for
+        a sensor that is already set up, for example after a soft reload of the microcontroller.
+        Note that the sensor may still be powered down; set :attr:`enabled` if needed
 
 
     **Quickstart: Importing and using the HTS221**
@@ -149,6 +158,12 @@ class HTS221:  # pylint: disable=too-many-instance-attributes
             temperature = hts.temperature
             relative_humidity = hts.relative_humidity
 
+        or read both from a single measurement with :attr:`measurements`
+
+        .. code-block:: python
+
+            relative_humidity, temperature = hts.measurements
+
     """
 
     _chip_id = ROUnaryStruct(_WHO_AM_I, "<B")
@@ -159,98 +174,133 @@ class HTS221:  # pylint: disable=too-many-instance-attributes
     _one_shot_bit = RWBit(_CTRL_REG2, 0)
     _temperature_status_bit = ROBit(_STATUS_REG, 0)
     _humidity_status_bit = ROBit(_STATUS_REG, 1)
-    _raw_temperature = ROUnaryStruct(_TEMP_OUT_L, "<h")
-    _raw_humidity = ROUnaryStruct(_HUMIDITY_OUT_L, "<h")
 
-    # humidity calibration consts
-    _t0_deg_c_x8_lsbyte = ROBits(8, _T0_DEGC_X8, 0)
-    _t1_deg_c_x8_lsbyte = ROBits(8, _T1_DEGC_X8, 0)
-    _t1_t0_deg_c_x8_msbits = ROBits(4, _T1_T0_MSB, 0)
-
-    _t0_out = ROUnaryStruct(_T0_OUT, "<h")
-    _t1_out = ROUnaryStruct(_T1_OUT, "<h")
-
-    _h0_rh_x2 = ROUnaryStruct(_H0_RH_X2, "<B")
-    _h1_rh_x2 = ROUnaryStruct(_H1_RH_X2, "<B")
-
-    _h0_t0_out = ROUnaryStruct(_H0_T0_OUT, "<h")
-    _h1_t0_out = ROUnaryStruct(_H1_T1_OUT, "<h")
-
-    def __init__(self, i2c_bus: I2C) -> None:
+    def __init__(self, i2c_bus: I2C, max_age: float = 0.05, reset: bool = True) -> None:
         self.i2c_device = i2cdevice.I2CDevice(i2c_bus, _HTS221_DEFAULT_ADDRESS)
-        if not self._chip_id in [_HTS221_CHIP_ID]:
-            raise RuntimeError(
-                "Failed to find HTS221HB! Found chip ID 0x%x" % self._chip_id
-            )
-        self._boot()
-        self.enabled = True
-        self.data_rate = Rate.RATE_12_5_HZ  # pylint:disable=no-member
-
-        t1_t0_msbs = self._t1_t0_deg_c_x8_msbits
-        self.calib_temp_value_0 = self._t0_deg_c_x8_lsbyte
-        self.calib_temp_value_0 |= (t1_t0_msbs & 0b0011) << 8
-
-        self.calibrated_value_1 = self._t1_deg_c_x8_lsbyte
-        self.calibrated_value_1 |= (t1_t0_msbs & 0b1100) << 6
-
-        self.calib_temp_value_0 >>= 3  # divide by 8 to remove x8
-        self.calibrated_value_1 >>= 3  # divide by 8 to remove x8
+        self._register = bytearray(1)
+        self._buffer = bytearray(4)
+        self._raw_humidity = 0
+        self._raw_temperature = 0
+        self._max_age = int(max_age * 1000)  # in milliseconds
+        self._last_read = None
+        chip_id = self._chip_id
+        if chip_id != _HTS221_CHIP_ID:
+            raise RuntimeError("Failed to find HTS221HB! Found chip ID 0x%x" % chip_id)
+        if reset:
+            self._boot()
+            self._power_up(Rate.RATE_12_5_HZ)  # pylint:disable=no-member
+
+        self._load_calibration_values()
+
+    # The calibration registers (0x30-0x3F) are contiguous, so read them all in one
+    # transaction. Offsets into the buffer are relative to _H0_RH_X2:
+    #   0: H0_rH_x2, 1: H1_rH_x2, 2: T0_degC_x8 LSB, 3: T1_degC_x8 LSB,
+    #   5: T1/T0 MSBs (bits 0-1 are T0 bits 8-9, bits 2-3 are T1 bits 8-9),
+    #   6: H0_T0_OUT, 10: H1_T0_OUT, 12: T0_OUT, 14: T1_OUT (all int16 LE)
+    def _load_calibration_values(self) -> None:
+        buffer = bytearray(16)
+        self._read_registers(_H0_RH_X2, buffer)
+
+        t1_t0_msbs = buffer[5]
+        t0_deg_c_x8 = buffer[2] | ((t1_t0_msbs & 0b0011) << 8)
+        t1_deg_c_x8 = buffer[3] | ((t1_t0_msbs & 0b1100) << 6)
+
+        h0_rh_x2 = buffer[0]
+        h1_rh_x2 = buffer[1]
+
+        # 0x38-0x39 between H0_T0_OUT and H1_T0_OUT are reserved
+        h0_t0_out, _, h1_t0_out, t0_out, t1_out = struct.unpack_from(
+            "<hhhhh", buffer, 6
+        )
 
-        self.calib_temp_meas_0 = self._t0_out
-        self.calib_temp_meas_1 = self._t1_out
+        # Decoded calibration points, kept with their original (integer degrees/%rH) values
+        self.calib_temp_value_0 = t0_deg_c_x8 >> 3  # divide by 8 to remove x8
+        self.calibrated_value_1 = t1_deg_c_x8 >> 3  # divide by 8 to remove x8
+        self.calib_temp_meas_0 = t0_out
+        self.calib_temp_meas_1 = t1_out
 
-        self.calib_hum_value_0 = self._h0_rh_x2
-        self.calib_hum_value_0 >>= 1  # divide by 2 to remove x2
+        self.calib_hum_value_0 = h0_rh_x2 >> 1  # divide by 2 to remove x2
+        self.calib_hum_value_1 = h1_rh_x2 >> 1  # divide by 2 to remove x2
+        self.calib_hum_meas_0 = h0_t0_out
+        self.calib_hum_meas_1 = h1_t0_out
 
-        self.calib_hum_value_1 = self._h1_rh_x2
-        self.calib_hum_value_1 >>= 1  # divide by 2 to remove x2
+        # The calibration never changes, so reduce each linear interpolation between the
+        # two calibration points to `raw * scale + bias`. Use the full-precision x8/x2 values
+        # rather than the truncated attributes above
+        self._temp_scale = (t1_deg_c_x8 - t0_deg_c_x8) / 8.0 / (t1_out - t0_out)
+        self._temp_bias = t0_deg_c_x8 / 8.0 - self._temp_scale * t0_out
 
-        self.calib_hum_meas_0 = self._h0_t0_out
-        self.calib_hum_meas_1 = self._h1_t0_out
+        self._hum_scale = (h1_rh_x2 - h0_rh_x2) / 2.0 / (h1_t0_out - h0_t0_out)
+        self._hum_bias = h0_rh_x2 / 2.0 - self._hum_scale * h0_t0_out
 
     # This is the closest thing to a software reset. It re-loads the calibration values from flash
     def _boot(self) -> None:
         self._boot_bit = True
-        # wait for the reset to finish
-        while self._boot_bit:
-            pass
+        # wait up to ~100ms for the reset to finish, polling gently so the bus stays free for
+        # other devices. Counting polls avoids depending on the float time.monotonic() resolution
+        for _ in range(100):
+            if not self._boot_bit:
+                return
+            time.sleep(0.001)
+        raise RuntimeError("Timed out waiting for the HTS221 to boot")
+
+    # Equivalent to setting `enabled` and then `data_rate`, but both fields live in
+    # CTRL_REG1 so do a single read-modify-write while holding the bus once
+    def _power_up(self, rate: int) -> None:
+        buffer = bytearray(2)
+        buffer[0] = _CTRL_REG1
+        with self.i2c_device as i2c:
+            i2c.write_then_readinto(buffer, buffer, out_end=1, in_start=1)
+            buffer[1] = (buffer[1] & ~_CTRL_REG1_ODR_MASK) | _CTRL_REG1_PD | rate
+            i2c.write(buffer)
+
+    # Fill `buffer` starting at `register` using a single repeated-start transaction.
+    # The top bit of the register address enables auto-increment for multi-byte reads.
+    # The address is written from a preallocated buffer so polling doesn't allocate
+    def _read_registers(self, register: int, buffer: bytearray) -> None:
+        self._register[0] = register | 0x80
+        with self.i2c_device as i2c:
+            i2c.write_then_readinto(self._register, buffer)
+
+    # Humidity and temperature outputs are adjacent, so read all four bytes in one
+    # transaction; the datasheet recommends this to avoid mixing samples. Readings
+    # younger than max_age are reused so paired property accesses share one read.
+    # ticks_diff is only meaningful for gaps under 2**28 ms; a longer gap can wrap to a
+    # negative difference, which must not count as young
+    def _update(self) -> None:
+        now = ticks_ms()
+        if (
+            self._last_read is not None
+            and 0 <= ticks_diff(now, self._last_read) < self._max_age
+        ):
+            return
+        self._read_registers(_HUMIDITY_OUT_L, self._buffer)
+        self._raw_humidity, self._raw_temperature = struct.unpack_from(
+            "<hh", self._buffer
+        )
+        self._last_read = now  # only after a successful read, so failures aren't cached
 
     @property
     def relative_humidity(self) -> float:
         """The current relative humidity measurement in %rH"""
-        calibrated_value_delta = self.calib_hum_value_1 - self.calib_hum_value_0
-        calibrated_measurement_delta = self.calib_hum_meas_1 - self.calib_hum_meas_0
-
-        calibration_value_offset = self.calib_hum_value_0
-        calibrated_measurement_offset = self.calib_hum_meas_0
-        zeroed_measured_humidity = self._raw_humidity - calibrated_measurement_offset
-
-        correction_factor = calibrated_value_delta / calibrated_measurement_delta
-
-        adjusted_humidity = (
-            zeroed_measured_humidity * correction_factor + calibration_value_offset
-        )
-
-        return adjusted_humidity
+        self._update()
+        return self._raw_humidity * self._hum_scale + self._hum_bias
 
     @property
     def temperature(self) -> float:
         """The current temperature measurement in degrees Celsius"""
+        self._update()
+        return self._raw_temperature * self._temp_scale + self._temp_bias
 
-        calibrated_value_delta = self.calibrated_value_1 - self.calib_temp_value_0
-        calibrated_measurement_delta = self.calib_temp_meas_1 - self.calib_temp_meas_0
-
-        calibration_value_offset = self.calib_temp_value_0
-        calibrated_measurement_offset = self.calib_temp_meas_0
-        zeroed_measured_temp = self._raw_temperature - calibrated_measurement_offset
-
-        correction_factor = calibrated_value_delta / calibrated_measurement_delta
-
-        adjusted_temp = (
-            zeroed_measured_temp * correction_factor
-        ) + calibration_value_offset
-
-        return adjusted_temp
+    @property
+    def measurements(self) -> Tuple[float, float]:
+        """A tuple of the current :attr:`relative_humidity` in %rH and :attr:`temperature` in
+        degrees Celsius, both taken from the same read of the sensor"""
+        self._update()
+        return (
+            self._raw_humidity * self._hum_scale + self._hum_bias,
+            self._raw_temperature * self._temp_scale + self._temp_bias,
+        )
 
     @property
     def data_rate(self) -> int:
@@ -263,20 +313,36 @@ class HTS221:  # pylint: disable=too-many-instance-attributes
 
     @data_rate.setter
     def data_rate(self, value: int) -> None:
-        if not Rate.is_valid(value):
+        # every value of the 2-bit ODR field is a valid `Rate`. bool is an int subclass,
+        # so compare the type exactly to keep True/False from passing as 1/0
+        max_rate = Rate.RATE_12_5_HZ  # pylint:disable=no-member
+        # pylint: disable-next=unidiomatic-typecheck
+        if type(value) is not int or not 0 <= value <= max_rate:
             raise AttributeError("data_rate must be a `Rate`")
 
         self._data_rate = value
 
     @property
     def humidity_data_ready(self) -> bool:
-        """Returns true if a new relative humidity measurement is available to be read"""
-        return self._humidity_status_bit
+        """Returns true if a new relative humidity measurement is available to be read.
+        When it returns `True` the cached reading is discarded, so the next access to
+        :attr:`relative_humidity`, :attr:`temperature` or :attr:`measurements` reads the sensor
+        again even if ``max_age`` has not elapsed"""
+        ready = self._humidity_status_bit
+        if ready:
+            self._last_read = None  # make sure the new measurement is read
+        return ready
 
     @property
     def temperature_data_ready(self) -> bool:
-        """Returns true if a new temperature measurement is available to be read"""
-        return self._temperature_status_bit
+        """Returns true if a new temperature measurement is available to be read.
+        When it returns `True` the cached reading is discarded, so the next access to
+        :attr:`relative_humidity`, :attr:`temperature` or :attr:`measurements` reads the sensor
+        again even if ``max_age`` has not elapsed"""
+        ready = self._temperature_status_bit
+        if ready:
+            self._last_read = None  # make sure the new measurement is read
+        return ready
 
     def take_measurements(self) -> None:
         """Update the value of :attr:`relative_humidity` and :attr:`temperature` by taking a single
@@ -284,3 +350,4 @@ class HTS221:  # pylint: disable=too-many-instance-attributes
         self._one_shot_bit = True
         while self._one_shot_bit:
             pass
+        self._last_read = None  # make sure the new measurement is read
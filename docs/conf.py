@@ -26,7 +26,12 @@ extensions = [
 # Uncomment the below if you use native CircuitPython modules such as
 # digitalio, micropython and busio. List the modules you use. Without it, the
 # autodoc module docs will fail to generate with a warning.
-autodoc_mock_imports = ["micropython", "adafruit_bus_device", "adafruit_register"]
+autodoc_mock_imports = [
+    "micropython",
+    "adafruit_bus_device",
+    "adafruit_register",
+    "adafruit_ticks",
+]
 
 
 intersphinx_mapping = {
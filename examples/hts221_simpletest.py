@@ -14,7 +14,8 @@ print("Using data rate of: {:.1f} Hz".format(data_rate))
 print("")
 
 while True:
-    print("Relative Humidity: {:.2f} % rH".format(hts.relative_humidity))
-    print("Temperature: {:.2f} C".format(hts.temperature))
+    relative_humidity, temperature = hts.measurements
+    print("Relative Humidity: {:.2f} % rH".format(relative_humidity))
+    print("Temperature: {:.2f} C".format(temperature))
     print("")
     time.sleep(1)